@@ -18,26 +18,95 @@ Examples:
 
 """
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 import sys
 import shutil
 import re
 from xml import sax
-from collections import defaultdict
-from textwrap import wrap
+from xml.parsers import expat
+from textwrap import TextWrapper
 from io import StringIO
+from contextlib import suppress
+import os
 
 import yaml
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
 
 
 DEFAULT_YAML_HEADER = {
     'layout': 'default'
 }
 
+# Same chunk size as xml.sax's ExpatParser, so character data is reported
+# in the same pieces as before.
+PARSE_BUFSIZE = 2 ** 16 - 20
+
+# Inline markup that keeps the surrounding text together
+INLINE_TAGS = frozenset(('u', 'b', 'f'))
+
+anchor_x_re = re.compile(r'\(X+\)')
+escaped_star_re = re.compile(r'\\\*')
+non_word_re = re.compile(r'[^\w-]')
+plain_scalar_re = re.compile(r'[^\W\d_][\w .,()§/-]*(?<! )')
+no_emph_re = [
+    re.compile(r'(\S?|^)([\*_])(\S)'),
+    re.compile('([^\\\\s])([\\*_])(\\S?|$)')
+]
+
+text_wrapper = TextWrapper()
+yaml_resolver = yaml.resolver.Resolver()
+
+# Lower-cased tag names, keyed by the name as found in the XML
+tag_names = {}
+
+
+def wrap(text):
+    """Same as textwrap.wrap() but skips the wrapper for text that fits."""
+    if len(text) <= text_wrapper.width and text.isprintable():
+        text = text.rstrip(' ')
+        return [text] if text else []
+    return text_wrapper.wrap(text)
+
+
+def is_plain_scalar(value):
+    return (isinstance(value, str) and
+            plain_scalar_re.fullmatch(value) is not None and
+            # PyYAML escapes characters outside the BMP
+            max(value) < '\U00010000' and
+            yaml_resolver.resolve(yaml.ScalarNode, value, (True, False)) ==
+            yaml_resolver.DEFAULT_SCALAR_TAG)
+
+
+def dump_meta(meta):
+    """Dump meta as a YAML document without going through PyYAML.
+
+    Only handles the common case of short strings that PyYAML writes
+    unquoted and returns None otherwise.
+    """
+    lines = ['---']
+    for key, value in sorted(meta.items()):
+        line = f'{key}: {value}'
+        if (len(line) > 80 or
+                not is_plain_scalar(key) or not is_plain_scalar(value)):
+            return None
+        lines.append(line)
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def escape_emphasis(text):
+    """Escape * and _ in character data so they don't become emphasis."""
+    if '*' in text or '_' in text:
+        for no_emph in no_emph_re:
+            text = no_emph.sub(r'\1\\\2\3', text)
+    return text
+
 
 class LawToMarkdown(sax.ContentHandler):
     state = None
-    text = ''
-    current_text = ''
     indent_by = ' ' * 4
     list_index = ''
     first_meta = True
@@ -48,13 +117,8 @@ class LawToMarkdown(sax.ContentHandler):
     no_tag = True
     last_list_index = None
     entry_count = 0
-    footnotes = {}
     current_heading_num = 1
     current_footnote = None
-    no_emph_re = [
-        re.compile(r'(\S?|^)([\*_])(\S)'),
-        re.compile('([^\\\\s])([\\*_])(\\S?|$)')
-    ]
     list_start_re = re.compile(r'^(\d+)\.')
 
     def __init__(self, fileout,
@@ -65,16 +129,60 @@ class LawToMarkdown(sax.ContentHandler):
         self.yaml_header = yaml_header
         self.heading_anchor = heading_anchor
         self.orig_slug = orig_slug
+        self.footnotes = {}
+        # Text is collected in lists and joined on demand; repeated
+        # ``+=`` on instance attributes copies the whole buffer every time.
+        self.text_parts = []
+        self.current_parts = []
+        self.indents = [self.indent_by * i for i in range(8)]
+        # Output is collected per norm and written to fileout in one go
+        self.buffer = StringIO()
+        self.start_handlers = {
+            'table': self.start_table,
+            'dl': self.start_dl,
+            'row': self.start_row,
+            'dd': self.start_dd,
+            'entry': self.start_entry,
+            'img': self.start_img,
+            'dt': self.start_dt,
+        }
+        self.start_handlers.update(
+            dict.fromkeys(INLINE_TAGS, self.start_inline))
+        self.end_handlers = {
+            'br': self.end_br,
+            'table': self.end_table,
+            'dl': self.end_dl,
+            'dd': self.end_dd,
+            'entry': self.end_entry,
+            'la': self.end_la,
+            'row': self.end_row,
+            'p': self.end_p,
+            'title': self.end_title,
+            'subtitle': self.end_subtitle,
+            'norm': self.end_norm,
+        }
 
     def out(self, content: str):
-        self.fileout.write(content)
+        self.buffer.write(content)
         return self
 
+    def flush_output(self):
+        self.fileout.write(self.buffer.getvalue())
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+    def get_indent(self, indent):
+        if indent <= 0:
+            return ''
+        indents = self.indents
+        while len(indents) <= indent:
+            indents.append(indents[-1] + self.indent_by)
+        return indents[indent]
+
     def out_indented(self, content, indent=None):
         if indent is None:
             indent = self.indent_level
-        self.out(self.indent_by * indent)
-        self.out(content)
+        self.out(self.get_indent(indent) + content)
 
     def write(self, content='', nobreak=False):
         self.out(content + ('\n' if not nobreak else ''))
@@ -89,101 +197,145 @@ class LawToMarkdown(sax.ContentHandler):
                               (len(self.last_list_index) + 1))
             first_indent = f" {self.indent_by[0:space_count]}"
             self.last_list_index = None
-        for line in wrap(text):
-            if first_indent:
-                self.out(first_indent)
-            else:
-                self.out(self.indent_by * indent)
-                line = self.list_start_re.sub('\\1\\.', line)
-            first_indent = ''
-            self.write(line)
+        lines = wrap(text)
+        if not lines:
+            return
+        indent_str = self.get_indent(indent)
+        list_start_sub = self.list_start_re.sub
+        block = [indent_str + list_start_sub('\\1\\.', line)
+                 for line in lines]
+        if first_indent:
+            block[0] = first_indent + lines[0]
+        block.append('')
+        self.out('\n'.join(block))
+
+    def get_text(self):
+        return ''.join(self.text_parts)
+
+    def merge_current_text(self):
+        """Move pending character data into the text buffer.
+
+        Same result as ``(text + current_text).replace('\\n', ' ').strip()``
+        without re-scanning the text collected so far.
+        """
+        text = ''.join(self.current_parts).replace('\n', ' ')
+        self.current_parts.clear()
+        parts = self.text_parts
+        if parts and parts[-1] == '\n':
+            # Line break appended by a preceding <BR/>
+            parts.pop()
+            text = ' ' + text
+        if not parts:
+            text = text.lstrip()
+        text = text.rstrip()
+        if text:
+            parts.append(text)
 
     def flush_text(self):
-        if self.text.strip():
-            self.write_wrapped(self.text)
-        self.text = ''
+        text_parts = self.text_parts
+        if not text_parts:
+            return
+        text = ''.join(text_parts)
+        if text.strip():
+            self.write_wrapped(text)
+        text_parts.clear()
 
     def startElement(self, name, attrs):
-        name = name.lower()
+        name = (tag_names.get(name) or
+                tag_names.setdefault(name, sys.intern(name.lower())))
         self.no_tag = False
         if self.ignore_until is not None:
             return
+        state = self.state
         if name == 'fnr':
-            if self.state == 'meta':
+            if state == 'meta':
                 self.ignore_until = 'fnr'
                 return
             else:
-                if not attrs['ID'] in self.footnotes:
-                    self.footnotes[attrs['ID']] = None
-                    self.write(f"[^{attrs['ID']}]")
+                footnote_id = attrs['ID']
+                if footnote_id not in self.footnotes:
+                    self.footnotes[footnote_id] = None
+                    self.write(f"[^{footnote_id}]")
         if name == 'fussnoten':
             self.ignore_until = 'fussnoten'
         if name == "metadaten":
-            self.meta = defaultdict(list)
+            self.meta = {}
             self.state = 'meta'
             return
         if name == "text":
             self.indent_level = 0
-            self.state = 'text'
+            state = self.state = 'text'
         if name == 'footnotes':
-            self.state = 'footnotes'
-        if self.state == 'footnotes':
+            state = self.state = 'footnotes'
+        if state == 'footnotes':
             if name == 'footnote':
                 self.indent_level += 1
                 self.current_footnote = attrs['ID']
             return
 
-        self.text += self.current_text
-        self.text = self.text.replace('\n', ' ').strip()
-        self.current_text = ''
+        self.merge_current_text()
 
-        if name == 'table':
-            self.flush_text()
-            self.write()
-        elif name == 'dl':
-            self.flush_text()
-            self.write()
-            self.indent_level += 1
-        elif name == 'row' or name == 'dd':
-            if name == 'row':
-                self.indent_level += 1
-                self.list_index = '*'
-                self.write_list_item()
-            self.in_list_item += 1
-        elif name == 'entry':
-            self.indent_level += 1
-            self.in_list_item += 1
-            self.list_index = '*'
-            self.write_list_item()
-        elif name == 'img':
+        handler = self.start_handlers.get(name)
+        if handler is None:
             self.flush_text()
-            self.out_indented(
-                f"![{attrs.get('ALT', attrs['SRC'])}]({attrs['SRC']})")
-        elif name == 'dt':
-            self.in_list_index = True
-        elif name in ('u', 'b', 'f'):
-            pass
         else:
-            self.flush_text()
+            handler(attrs)
+
+    def start_table(self, attrs):
+        self.flush_text()
+        self.write()
+
+    def start_dl(self, attrs):
+        self.flush_text()
+        self.write()
+        self.indent_level += 1
+
+    def start_row(self, attrs):
+        self.indent_level += 1
+        self.list_index = '*'
+        self.write_list_item()
+        self.in_list_item += 1
+
+    def start_dd(self, attrs):
+        self.in_list_item += 1
+
+    def start_entry(self, attrs):
+        self.indent_level += 1
+        self.in_list_item += 1
+        self.list_index = '*'
+        self.write_list_item()
+
+    def start_img(self, attrs):
+        self.flush_text()
+        self.out_indented(
+            f"![{attrs.get('ALT', attrs['SRC'])}]({attrs['SRC']})")
+
+    def start_dt(self, attrs):
+        self.in_list_index = True
+
+    def start_inline(self, attrs):
+        pass
 
     def endElement(self, name):
-        name = name.lower()
+        name = (tag_names.get(name) or
+                tag_names.setdefault(name, sys.intern(name.lower())))
         self.no_tag = False
         if self.ignore_until is not None:
             if self.ignore_until == name:
                 self.ignore_until = None
             return
 
-        if name == 'u':
-            self.current_text = f' *{self.current_text.strip()}* '
-        elif name == 'f':
-            self.current_text = '*'
-        elif name == 'b':
-            self.current_text = f' **{self.current_text.strip()}** '
+        if name in INLINE_TAGS:
+            if name == 'u':
+                current_text = ''.join(self.current_parts).strip()
+                self.current_parts[:] = [f' *{current_text}* ']
+            elif name == 'f':
+                self.current_parts[:] = ['*']
+            elif name == 'b':
+                current_text = ''.join(self.current_parts).strip()
+                self.current_parts[:] = [f' **{current_text}** ']
 
-        self.text += self.current_text
-        self.text = self.text.replace('\n', ' ').strip()
-        self.current_text = ''
+        self.merge_current_text()
 
         if name == "metadaten":
             self.state = None
@@ -192,16 +344,18 @@ class LawToMarkdown(sax.ContentHandler):
                 self.write_big_header()
             else:
                 self.write_norm_header()
-            self.text = ''
+            self.text_parts.clear()
             return
-        if self.state == 'meta':
-            if name == 'enbez' and self.text == 'Inhaltsübersicht':
+        state = self.state
+        if state == 'meta':
+            text = self.get_text()
+            if name == 'enbez' and text == 'Inhaltsübersicht':
                 self.ignore_until = 'textdaten'
             else:
-                self.meta[name].append(self.text)
-            self.text = ''
+                self.add_meta(name, text)
+            self.text_parts.clear()
             return
-        elif self.state == 'footnotes':
+        elif state == 'footnotes':
             if name == 'footnote':
                 self.flush_text()
                 self.indent_level -= 1
@@ -213,8 +367,9 @@ class LawToMarkdown(sax.ContentHandler):
             self.current_footnote = None
 
         if self.in_list_index:
-            self.list_index += self.text
-            self.text = ''
+            text_parts = self.text_parts
+            self.list_index += ''.join(text_parts)
+            text_parts.clear()
             if name == 'dt':
                 if not self.list_index:
                     self.list_index = '*'
@@ -222,97 +377,135 @@ class LawToMarkdown(sax.ContentHandler):
                 self.in_list_index = False
             return
 
-        if name == 'br':
-            self.text += '\n'
-        elif name == 'table':
-            self.write()
-        elif name == 'dl':
-            self.indent_level -= 1
-            self.write()
-        elif name == 'dd' or name == 'entry':
-            self.in_list_item -= 1
-            if name == 'entry':
-                self.flush_text()
-                self.indent_level -= 1
-            self.write()
-        elif name == 'la' or name == 'row':
-            self.flush_text()
-            self.write()
-            if name == 'row':
-                self.indent_level -= 1
-                self.in_list_item -= 1
-        elif name == 'p':
-            self.flush_text()
-            self.write()
-        elif name == 'title':
-            self.text = self.text.replace('\n', ' ')
-            self.text = f'## {self.text}'
-            self.flush_text()
-            self.write()
-        elif name == 'subtitle':
-            self.text = self.text.replace('\n', ' ')
-            self.text = f'### {self.text}'
-            self.flush_text()
-            self.write()
+        handler = self.end_handlers.get(name)
+        if handler is not None:
+            handler()
+
+    def end_br(self):
+        self.text_parts.append('\n')
+
+    def end_table(self):
+        self.write()
+
+    def end_dl(self):
+        self.indent_level -= 1
+        self.write()
+
+    def end_dd(self):
+        self.in_list_item -= 1
+        self.write()
+
+    def end_entry(self):
+        self.in_list_item -= 1
+        self.flush_text()
+        self.indent_level -= 1
+        self.write()
+
+    def end_la(self):
+        self.flush_text()
+        self.write()
+
+    def end_row(self):
+        self.flush_text()
+        self.write()
+        self.indent_level -= 1
+        self.in_list_item -= 1
+
+    def end_p(self):
+        self.flush_text()
+        self.write()
+
+    def end_title(self):
+        self.text_parts.insert(0, '## ')
+        self.flush_text()
+        self.write()
+
+    def end_subtitle(self):
+        self.text_parts.insert(0, '### ')
+        self.flush_text()
+        self.write()
+
+    def end_norm(self):
+        self.flush_output()
 
     def characters(self, text):
         if self.ignore_until is not None:
             return
-        for no_emph_re in self.no_emph_re:
-            text = no_emph_re.sub(r'\1\\\2\3', text)
-        self.current_text += text
+        self.current_parts.append(escape_emphasis(text))
         self.no_tag = True
 
     def endDocument(self):
-        pass
+        self.flush_output()
 
     def write_list_item(self):
         self.last_list_index = self.list_index
         self.out_indented(self.list_index, indent=self.indent_level - 1)
         self.list_index = ''
 
+    def add_meta(self, name, text):
+        # Most tags occur once per norm, so only repeated ones get a list
+        value = self.meta.get(name)
+        if value is None:
+            self.meta[name] = text
+        elif isinstance(value, str):
+            self.meta[name] = [value, text]
+        else:
+            value.append(text)
+
+    def get_meta(self, name):
+        value = self.meta[name]
+        return value if isinstance(value, str) else value[0]
+
+    def get_meta_list(self, name):
+        value = self.meta.get(name, [])
+        return [value] if isinstance(value, str) else value
+
     def clean_title(self, title):
         title = title.replace(' \\*)', '').strip()
-        title = re.sub(r'\\\*', '*', title)
+        title = escaped_star_re.sub('*', title)
         return title
 
     def write_big_header(self):
-        self.store_filename(self.meta['jurabk'][0])
+        self.store_filename(self.get_meta('jurabk'))
 
-        title = self.clean_title(self.meta['langue'][0])
+        title = self.clean_title(self.get_meta('langue'))
 
         meta = {
             'Title': title,
             'origslug': self.orig_slug,
-            'jurabk': self.meta['jurabk'][0],
+            'jurabk': self.get_meta('jurabk'),
             'slug': self.filename
         }
 
         if self.yaml_header:
             meta.update(self.yaml_header)
-            self.out(yaml.safe_dump(meta,
-                                    explicit_start=True,
-                                    explicit_end=False,
-                                    allow_unicode=True,
-                                    default_flow_style=False
-                                    ))
+            header = dump_meta(meta)
+            if header is None:
+                header = yaml.dump(meta,
+                                   Dumper=SafeDumper,
+                                   explicit_start=True,
+                                   explicit_end=False,
+                                   allow_unicode=True,
+                                   default_flow_style=False
+                                   )
+            self.out(header)
             # Blank line ensures meta doesn't become headline
             self.write('\n---')
         else:
             for k, v in list(meta.items()):
                 self.write(f"{k}: {v}")
         self.write()
-        heading = f"# {title} ({self.meta['jurabk'][0]})"
+        heading = f"# {title} ({self.get_meta('jurabk')})"
         self.write(heading)
         self.write()
         if 'ausfertigung-datum' in self.meta:
             self.write(
-                f"Ausfertigungsdatum\n:   {self.meta['ausfertigung-datum'][0]}\n")
+                f"Ausfertigungsdatum\n:   {self.get_meta('ausfertigung-datum')}\n")
         if 'periodikum' in self.meta and 'zitstelle' in self.meta:
             self.write(
-                f"Fundstelle\n:   {self.meta['periodikum'][0]}: {self.meta['zitstelle'][0]}\n")
+                f"Fundstelle\n:   {self.get_meta('periodikum')}: {self.get_meta('zitstelle')}\n")
 
-        for text in self.meta.get('standkommentar', []):
+        for text in self.get_meta_list('standkommentar'):
             try:
                 k, v = text.split(' durch ', 1)
             except ValueError:
@@ -320,39 +513,39 @@ class LawToMarkdown(sax.ContentHandler):
             else:
                 k = k.capitalize()
                 self.write(f'{k} durch\n:   {v}\n')
-        self.text = ''
+        self.text_parts.clear()
 
     def write_norm_header(self):
         hn = '#'
         if 'gliederungskennzahl' in self.meta:
-            heading_num = len(self.meta['gliederungskennzahl'][0]) / 3 + 1
+            heading_num = len(self.get_meta('gliederungskennzahl')) / 3 + 1
             self.current_heading_num = heading_num
         else:
             heading_num = self.current_heading_num + 1
         title = ''
         link = ''
         if 'gliederungsbez' in self.meta:
-            title = self.meta['gliederungsbez'][0]
+            title = self.get_meta('gliederungsbez')
             link = title
         if 'gliederungstitel' in self.meta:
             if title:
-                title = f"{title} - {self.meta['gliederungstitel'][0]}"
+                title = f"{title} - {self.get_meta('gliederungstitel')}"
             else:
-                title = self.meta['gliederungstitel'][0]
+                title = self.get_meta('gliederungstitel')
         if 'enbez' in self.meta:
-            title = self.meta['enbez'][0]
+            title = self.get_meta('enbez')
             link = title
         if 'titel' in self.meta:
             if title:
-                title = f"{title} {self.meta['titel'][0]}"
+                title = f"{title} {self.get_meta('titel')}"
             else:
-                title = self.meta['titel'][0]
+                title = self.get_meta('titel')
         if not title:
             return
         hn = hn * int(min(heading_num, 6))
         if self.heading_anchor:
             if link:
-                link = re.sub(r'\(X+\)', '', link).strip()
+                link = anchor_x_re.sub('', link).strip()
                 link = link.replace('§', 'P')
                 link = f' [{link}]'
         else:
@@ -373,57 +566,121 @@ class LawToMarkdown(sax.ContentHandler):
         }
         for k, v in list(replacements.items()):
             abk = abk.replace(k, v)
-        abk = re.sub(r'[^\w-]', '_', abk)
+        abk = non_word_re.sub('_', abk)
         self.filename = abk
 
 
+def make_parser(handler):
+    """Create an expat parser that calls the handler's SAX methods directly.
+
+    xml.sax puts a Python-level dispatch layer between expat and the
+    ContentHandler (and builds an AttributesImpl for every element).
+    """
+    parser = expat.ParserCreate()
+    parser.StartElementHandler = handler.startElement
+    parser.EndElementHandler = handler.endElement
+    parser.CharacterDataHandler = handler.characters
+    # Never load external entities, like sax.handler.feature_external_ges
+    parser.SetParamEntityParsing(
+        expat.XML_PARAM_ENTITY_PARSING_UNLESS_STANDALONE)
+    parser.ExternalEntityRefHandler = lambda *args: 1
+    return parser
+
+
 def law_to_markdown(filein, fileout=None, name=None):
     ret = False
     if fileout is None:
         fileout = StringIO()
         ret = True
-    parser = sax.make_parser()
     if name is None:
         orig_slug = filein.name.split('/')[-1].split('.')[0]
     else:
         orig_slug = name
     handler = LawToMarkdown(fileout, orig_slug=orig_slug)
-    parser.setFeature(sax.handler.feature_external_ges, False)
-    parser.setContentHandler(handler)
-    parser.parse(filein)
+    parser = make_parser(handler)
+    buffer = filein.read(PARSE_BUFSIZE)
+    while buffer:
+        parser.Parse(buffer, False)
+        buffer = filein.read(PARSE_BUFSIZE)
+    parser.Parse(b'', True)
+    handler.endDocument()
     if ret:
         fileout.filename = handler.filename
         return fileout
+    # Only set by a document with <metadaten>
+    return getattr(handler, 'filename', None)
+
+
+def convert_law(filename, tmpfilename):
+    """Convert a law into tmpfilename and return its slug."""
+    try:
+        with open(filename, "r") as infile, \
+                open(tmpfilename, 'w') as outfile:
+            slug = law_to_markdown(infile, outfile)
+        if slug is None:
+            raise ValueError(f'{filename} has no metadata')
+        return slug
+    except BaseException:
+        with suppress(FileNotFoundError):
+            os.unlink(tmpfilename)
+        raise
+
+
+def write_law(outputpath, inpath, slug, tmpfilename):
+    law_filename = f'{inpath.name}.xml'
+    outpath = outputpath / slug[0] / slug
+    print(outpath)
+    assert len(outpath.parents) > 1  # um, better be safe
+    outfilename = outpath / 'index.md'
+    shutil.rmtree(outpath, ignore_errors=True)
+    outpath.mkdir(parents=True)
+    with os.scandir(inpath) as parts:
+        for part in parts:
+            if part.name == law_filename:
+                continue
+            part_filename = outpath / part.name
+            # lawde.py replaces law directories instead of changing files
+            # in place, so a hard link is as good as a copy
+            try:
+                os.link(part.path, part_filename)
+            except OSError:
+                shutil.copy(part.path, part_filename)
+    os.replace(tmpfilename, outfilename)
 
 
 def main(arguments):
     if arguments['<inputpath>'] is None and arguments['<outputpath>'] is None:
         law_to_markdown(sys.stdin, sys.stdout, name=arguments['--name'])
         return
+    laws = []
     paths = set()
     for filename in Path(arguments['<inputpath>']).glob('*/*/*.xml'):
-        inpath = filename.resolve().parent
+        inpath = filename.parent
         if inpath in paths:
             continue
         paths.add(inpath)
-        law_name = inpath.name
-        with open(filename, "r") as infile:
-            out = law_to_markdown(infile)
-        slug = out.filename
-        outpath = (Path(arguments['<outputpath>']) / slug[0] / slug).resolve()
-        print(outpath)
-        assert len(outpath.parents) > 1  # um, better be safe
-        outfilename = outpath / 'index.md'
-        shutil.rmtree(outpath, ignore_errors=True)
-        outpath.mkdir(parents=True)
-        for part in inpath.glob('*'):
-            if part.name == f'{law_name}.xml':
-                continue
-            part_filename = part.name
-            shutil.copy(part, outpath / part_filename)
-        with open(outfilename, 'w') as outfile:
-            outfile.write(out.getvalue())
-        out.close()
+        laws.append((filename, inpath))
+    outputpath = Path(arguments['<outputpath>']).resolve()
+    outputpath.mkdir(parents=True, exist_ok=True)
+    # The conversion runs in worker processes that write the markdown to
+    # temporary files next to the output, so it can be moved into place
+    # without a copy. Output directories are set up here in input order
+    # since two laws may share a slug.
+    tmpfilenames = [outputpath / f'.lawdown-{i}.md' for i in range(len(laws))]
+    try:
+        with ProcessPoolExecutor() as executor:
+            slugs = executor.map(convert_law,
+                                 [filename for filename, _ in laws],
+                                 tmpfilenames,
+                                 chunksize=16)
+            for (filename, inpath), tmpfilename, slug in zip(
+                    laws, tmpfilenames, slugs):
+                write_law(outputpath, inpath, slug, tmpfilename)
+    finally:
+        # Left behind by laws that weren't written after an error
+        for tmpfilename in tmpfilenames:
+            with suppress(FileNotFoundError):
+                os.unlink(tmpfilename)
 
 
 if __name__ == '__main__':
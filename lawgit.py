@@ -17,47 +17,193 @@ Examples:
   lawgit.py autocommit ../gesetze --dry-run
 
 """
+import os
 import re
+import hashlib
 from pathlib import Path
 import json
+import pickle
 from datetime import datetime, timedelta
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
-from git import Repo, Commit, DiffIndex, Diff
+from git import Repo, Diff
+from git.diff import decode_path
 from git.exc import GitCommandError
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bump when the data built by the sources' parse() methods changes
+CACHE_VERSION = 3
+
+# Notes on changes that haven't been worked into a law's text yet
+transient_re = re.compile(
+    'noch nicht (?:berücksichtigt|abschließend bearbeitet)')
+
+# BGBl parts as numbers and as cited
+PART_NAMES = {1: 'I', 2: 'II', 3: 'III'}
+PART_NUMBERS = {name: part for part, name in PART_NAMES.items()}
+
+# Below this number of laws, worker processes cost more than they save
+PARALLEL_MIN_LAWS = 64
+
+# Number of laws whose patches are read with a single git diff call
+PATCH_BATCH_SIZE = 500
+
+# Sources found for the text of changes by earlier runs
+RESULT_CACHE = 'data/.lawgit_cache.json'
 
 
 def log(*message: str):
     print(datetime.now(), ":", *message)
 
 
+def load_json(source):
+    with open(source, 'rb') as f:
+        if orjson is not None:
+            return orjson.loads(f.read())
+        return json.load(f)
+
+
+def find_all(text: str, sub: str) -> Iterator[int]:
+    position = text.find(sub)
+    while position != -1:
+        yield position
+        position = text.find(sub, position + 1)
+
+
+def iter_lines_at(text: str, positions: Iterable[int]) -> Iterator[str]:
+    """Yield each line of text that contains one of the sorted positions."""
+    end = -1
+    for position in positions:
+        if position <= end:
+            continue
+        start = text.rfind('\n', 0, position) + 1
+        end = text.find('\n', position)
+        if end == -1:
+            end = len(text)
+        yield text[start:end]
+
+
+def keys_pattern(keys: Iterable[str]) -> str:
+    """Build an alternation of keys that branches like a trie.
+
+    A flat alternation retries every key at every position, sharing the
+    prefixes keeps a scan close to linear. At a position the longest key
+    is preferred.
+    """
+    trie: Dict[str, dict] = {}
+    for key in keys:
+        node = trie
+        for char in key:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        if len(branches) == 1 and '' not in node:
+            return branches[0]
+        pattern = '(?:%s)' % '|'.join(branches)
+        return pattern + '?' if '' in node else pattern
+
+    return build(trie) or '(?!)'
+
+
+def parse_date(date: str) -> Optional[datetime]:
+    """Parse a dd.mm.yyyy date, much faster than strptime()."""
+    try:
+        day, month, year = date.split('.')
+        return datetime(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+def get_entry_date(entry) -> datetime:
+    if entry['_date'] is None:
+        raise ValueError(f"invalid date {entry['date']!r}")
+    return entry['_date']
+
+
+def load_cached(source, parse):
+    """Return parse(source), cached in a pickle file next to source."""
+    cache = f'{source}.pkl'
+    try:
+        if os.path.getmtime(cache) >= os.path.getmtime(source):
+            with open(cache, 'rb') as f:
+                version, data = pickle.load(f)
+            if version == CACHE_VERSION:
+                return data
+    except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+        pass
+    data = parse(source)
+    try:
+        with open(f'{cache}.tmp', 'wb') as f:
+            pickle.dump((CACHE_VERSION, data), f, pickle.HIGHEST_PROTOCOL)
+        os.replace(f'{cache}.tmp', cache)
+    except OSError:
+        pass
+    return data
+
+
 class TransientState(Exception):
     pass
 
 
+def parse_patch(patch: bytes) -> Tuple[Optional[str], bytes]:
+    """Split the patch of a single file into its path and its hunks.
+
+    Reads the header like git.Diff does; the path is None where Diff has no
+    b_blob, e.g. for deleted files.
+    """
+    header = Diff.re_header.match(patch)
+    path = None
+    b_blob_id = header['b_blob_id']
+    if b_blob_id and b_blob_id.decode() != Diff.NULL_HEX_SHA:
+        if header['b_path']:
+            raw_path = decode_path(header['b_path'])
+        elif header['rename_to']:
+            raw_path = decode_path(header['rename_to'], has_ab_prefix=False)
+        else:
+            raw_path = decode_path(header['b_path_fallback'])
+        if raw_path:
+            path = raw_path.decode('utf-8', 'replace')
+    return path, patch[header.end():]
+
+
 class BGBlSource:
     """BGBl as a source for law change"""
 
+    # The only pattern that doesn't need 'BGBl' in the line
+    date_change_re = re.compile(
+        r'\d{1,2}\.\.?\d{1,2}\.\.?(?P<year>\d{4}) (?P<part>I+) (?:S\. )?(?P<page>\d+)')
+    # Part of every date_change_re match, but much faster to search for
+    date_part_re = re.compile(r' I+ ')
+
     change_re = [
         re.compile(
             r'BGBl +(?P<part>I+):? *(?P<year>\d{4}), +(?:S\. )?(?P<page>\d+)'),
         re.compile(
             r'BGBl +(?P<part>I+):? *(?P<year>\d{4}), \d \((?P<page>\d+)\)'),
         re.compile(r'BGBl +(?P<part>I+):? *(?P<year>\d{4}), (?P<page>\d+)'),
-        re.compile(
-            r'\d{1,2}\.\.?\d{1,2}\.\.?(?P<year>\d{4}) (?P<part>I+) (?:S\. )?(?P<page>\d+)'),
+        date_change_re,
         re.compile(
             r'(?P<year>\d{4}).{,8}?BGBl\.? +(?P<part>I+):? +(?:S\. )?(?P<page>\d+)'),
         # re.compile(u'Art. \d+ G v. (?P<day>\d{1,2}).(?P<month>\d{1,2}).(?P<year>\d{4})')
     ]
 
-    transient = (
-        "noch nicht berücksichtigt",
-        "noch nicht abschließend bearbeitet"
-    )
-
     def __init__(self, source):
         self.load(source)
 
@@ -65,28 +211,49 @@ class BGBlSource:
         return self.__class__.__name__
 
     def load(self, source):
-        self.data = {}
-        data = json.load(open(source))
-        for key, toc_list in data.items():
+        self.data = load_cached(source, self.parse)
+
+    def parse(self, source):
+        data = {}
+        for key, toc_list in load_json(source).items():
             for toc in toc_list:
                 if toc['kind'] == 'meta':
                     continue
-                toc['part_i'] = 'I' * toc['part']
-                self.data[(toc['year'], toc['page'], toc['part'])] = toc
+                toc['part_i'] = (PART_NAMES.get(toc['part']) or
+                                 'I' * toc['part'])
+                toc['_date'] = parse_date(toc['date'])
+                data[(toc['year'], toc['page'], toc['part'])] = toc
+        return data
 
-    def find_candidates(self, lines: List[str]):
+    def find_candidates(self, text: str):
         candidates = []
-        for line in lines:
-            for c_re in self.change_re:
+        # Most lines cite nothing, only run every pattern on the lines that
+        # have 'BGBl' or a date citation in them
+        positions = list(find_all(text, 'BGBl'))
+        positions.extend(m.start() for m in self.date_part_re.finditer(text))
+        positions.sort()
+        # A note only counts on a line with a match, most texts have none
+        transient = transient_re.search(text)
+        for line in iter_lines_at(text, positions):
+            # Every other pattern needs 'BGBl' in the line
+            if 'BGBl' in line:
+                change_re = self.change_re
+            elif self.date_change_re.search(line):
+                change_re = [self.date_change_re]
+            else:
+                continue
+            if transient and transient_re.search(line) and \
+                    any(c_re.search(line) for c_re in change_re):
+                raise TransientState
+            for c_re in change_re:
                 for match in c_re.finditer(line):
-                    if any(t in line for t in self.transient):
-                        raise TransientState
                     matchdict = match.groupdict()
                     if 'page' in matchdict:
+                        part = matchdict['part']
                         key = (
                             int(matchdict['year']),
                             int(matchdict['page']),
-                            len(matchdict['part'])
+                            PART_NUMBERS.get(part) or len(part)
                         )
                         if key in self.data:
                             candidates.append(key)
@@ -100,8 +267,7 @@ class BGBlSource:
         return self.get_date(key)
 
     def get_date(self, key):
-        bgbl_entry = self.data[key]
-        return datetime.strptime(bgbl_entry['date'], '%d.%m.%Y')
+        return get_entry_date(self.data[key])
 
     def get_branch_name(self, key):
         bgbl_entry = self.data[key]
@@ -120,6 +286,10 @@ class BGBlSource:
 class BAnzSource:
     """BAnz as a source for law change"""
 
+    # Applied to the text before looking for keys
+    clean_re = re.compile(r'[^\w \.\n]')
+    year_re = re.compile(r' \d{4} ')
+
     def __init__(self, source):
         self.load(source)
 
@@ -127,26 +297,67 @@ class BAnzSource:
         return self.__class__.__name__
 
     def load(self, source):
-        self.data = json.load(open(source))
-
-    def find_candidates(self, lines: List[str]) -> List[str]:
+        self.data = load_cached(source, self.parse)
+        self.automaton = None
+        if ahocorasick is not None and self.data:
+            # Values carry the position in data, so keys found in a line
+            # can be reported in the same order as the plain scan
+            self.automaton = ahocorasick.Automaton()
+            for index, key in enumerate(self.data):
+                self.automaton.add_word(key, (index, key))
+            self.automaton.make_automaton()
+            return
+        # Keys overlap, so look ahead at every position. Only the longest
+        # key starting there is matched, the keys it starts with are added
+        # from key_prefixes.
+        self.keys_re = re.compile('(?=(%s))' % keys_pattern(self.data))
+        self.key_index = {key: index for index, key in enumerate(self.data)}
+        self.key_prefixes = {}
+        for key in self.data:
+            prefixes = [key[:i] for i in range(1, len(key))
+                        if key[:i] in self.key_index]
+            if prefixes:
+                self.key_prefixes[key] = prefixes
+
+    def parse(self, source):
+        data = load_json(source)
+        for entry in data.values():
+            entry['_date'] = parse_date(entry['date'])
+        return data
+
+    def find_keys(self, line: str) -> List[str]:
+        if self.automaton is not None:
+            found = {value for _, value in self.automaton.iter(line)}
+            return [key for _, key in sorted(found)]
+        keys = set()
+        for match in self.keys_re.finditer(line):
+            key = match.group(1)
+            keys.add(key)
+            keys.update(self.key_prefixes.get(key, ()))
+        return sorted(keys, key=self.key_index.__getitem__)
+
+    def find_candidates(self, text: str) -> List[str]:
         candidates: List[str] = []
-        for line in lines:
-            line = re.sub(r'[^\w \.]', '', line)
-            line = re.sub(r' \d{4} ', ' ', line)
-            for key in self.data:
-                if key in line:
-                    if "noch nicht berücksichtigt" in line:
-                        raise TransientState
-                    candidates.append(key)
+        text = self.clean_re.sub('', text)
+        text = self.year_re.sub(' ', text)
+        if self.automaton is None:
+            positions = (match.start()
+                         for match in self.keys_re.finditer(text))
+        else:
+            positions = (end for end, _ in self.automaton.iter(text))
+        transient = "noch nicht berücksichtigt" in text
+        for line in iter_lines_at(text, positions):
+            for key in self.find_keys(line):
+                if transient and "noch nicht berücksichtigt" in line:
+                    raise TransientState
+                candidates.append(key)
         return candidates
 
     def get_order_key(self, key):
         return self.get_date(key)
 
     def get_date(self, key):
-        entry = self.data[key]
-        return datetime.strptime(entry['date'], '%d.%m.%Y')
+        return get_entry_date(self.data[key])
 
     def get_branch_name(self, key):
         entry = self.data[key]
@@ -170,11 +381,6 @@ class BAnzSource:
 class VkblSource:
     """VkBl as a source for law change"""
 
-    transient = (
-        "noch nicht berücksichtigt",
-        "noch nicht abschließend bearbeitet"
-    )
-
     change_re = [
         re.compile(r'VkBl: *(?P<year>\d{4}),? +(?:S\. )?(?P<page>\d+)')
     ]
@@ -186,21 +392,27 @@ class VkblSource:
         return self.__class__.__name__
 
     def load(self, source):
-        self.data = {}
-        data = json.load(open(source))
-        for key, value in data.items():
+        self.data = load_cached(source, self.parse)
+
+    def parse(self, source):
+        data = {}
+        for key, value in load_json(source).items():
             if value['jahr'] and value['seite']:
                 ident = (int(value['jahr']), int(value['seite']))
                 value['date'] = value['verffentlichtam']
-                self.data[ident] = value
+                value['_date'] = parse_date(value['date'])
+                data[ident] = value
+        return data
 
-    def find_candidates(self, lines):
+    def find_candidates(self, text: str):
         candidates = []
-        for line in lines:
+        transient = transient_re.search(text)
+        for line in iter_lines_at(text, find_all(text, 'VkBl')):
+            if transient and transient_re.search(line) and \
+                    any(c_re.search(line) for c_re in self.change_re):
+                raise TransientState
             for c_re in self.change_re:
                 for match in c_re.finditer(line):
-                    if any(t in line for t in self.transient):
-                        raise TransientState
                     matchdict = match.groupdict()
                     key = (
                         int(matchdict['year']),
@@ -214,8 +426,7 @@ class VkblSource:
         return self.get_date(key)
 
     def get_date(self, key):
-        entry = self.data[key]
-        return datetime.strptime(entry['verffentlichtam'], '%d.%m.%Y')
+        return get_entry_date(self.data[key])
 
     def get_branch_name(self, key):
         entry = self.data[key]
@@ -251,95 +462,271 @@ class VkblSource:
         return (f"{entry['title']}\n\n{entry['verkndetam']}: {entry['edition']} S. {entry['seite']} ({entry['vonummer']})")
 
 
-class LawGit:
-    laws = defaultdict(list)
-    law_changes: Dict[str, Tuple[bool, str, Path]] = {}
-    bgbl_changes = defaultdict(list)
+def find_in_sources(sources, text: str):
+    """Return index of the source and key of each candidate in text."""
+    # The sources search the whole text at once and look at single lines
+    # only where they found something; no pattern spans a line break
+    text = '\n'.join(text.splitlines())
+    candidates = []
+    for index, source in enumerate(sources):
+        try:
+            candidates.extend([(index, c)
+                               for c in source.find_candidates(text)])
+        except TransientState:
+            return []
+    return candidates
+
 
+def find_latest_source(sources, text: str, filename: Optional[Path]):
+    """Return index of the source and key of the latest change in text.
+
+    Falls back to the whole law in filename if text has no candidates, the
+    last item of the result tells whether it was found in text alone.
+    """
+    candidates = find_in_sources(sources, text)
+    in_text = bool(candidates)
+    if not candidates and filename is not None:
+        text = filename.read_text(encoding='utf-8')
+        candidates.extend(find_in_sources(sources, text))
+    if not candidates:
+        return None
+    # max() keeps the first of equally ordered candidates, the last wins
+    index, key = max(reversed(candidates),
+                     key=lambda c: sources[c[0]].get_order_key(c[1]))
+    return index, key, in_text
+
+
+def text_digest(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+# Sources of a worker process, see LawGit.determine_sources()
+worker_sources = None
+
+
+def init_worker(sources):
+    global worker_sources
+    worker_sources = sources
+
+
+def find_latest_source_in_worker(change: Tuple[str, Optional[Path]]):
+    return find_latest_source(worker_sources, *change)
+
+
+class LawGit:
     def __init__(self, path, dry_run=False, consider_old=False, grep=None):
+        self.laws: Dict[str, List[str]] = {}
+        self.law_changes: Dict[str, Tuple[bool, str, Path]] = {}
+        # Changed files that were found on disk by collect_laws()
+        self.existing_files = set()
         self.path = Path(path)
         self.dry_run = dry_run
         self.grep = grep
         self.consider_old = consider_old
         self.repo = Repo(path)
+        source_files = ['data/bgbl.json', 'data/banz.json', 'data/vkbl.json']
         self.sources = [
-            BGBlSource('data/bgbl.json'),
-            BAnzSource('data/banz.json'),
-            VkblSource('data/vkbl.json')
+            BGBlSource(source_files[0]),
+            BAnzSource(source_files[1]),
+            VkblSource(source_files[2])
         ]
+        # Cached results are only valid for the same source data
+        self.results_version = [CACHE_VERSION] + [
+            os.path.getmtime(f) for f in source_files]
+        self.results = self.load_results()
 
     def prepare_commits(self):
         branches = defaultdict(dict)
         self.collect_laws()
-        for law in self.laws:
-            result = self.determine_source(law)
+        laws = list(self.laws)
+        too_old = datetime.now() - timedelta(days=30 * 12)
+        # Many laws are changed by the same publication
+        dates = {}
+        names = {}
+        for law, result in zip(laws, self.determine_sources(laws)):
             if result is None:
                 continue
             source, key = result
-            date = source.get_date(key)
-            if not self.consider_old and date + timedelta(days=30 * 12) < datetime.now():
+            if result not in dates:
+                dates[result] = source.get_date(key)
+            if not self.consider_old and dates[result] < too_old:
                 log(f"Skipped {law} {result} (too old)")
                 continue
-            branch_name = source.get_branch_name(key)
-            ident = source.get_ident(key)
+            if result not in names:
+                names[result] = (source.get_branch_name(key),
+                                 source.get_ident(key))
+            branch_name, ident = names[result]
             branches[branch_name].setdefault(ident, [])
             branches[branch_name][ident].append((law, source, key))
         return branches
 
-    def collect_laws(self):
-        hcommit: Commit = self.repo.head.commit
-        wdiff: DiffIndex = hcommit.diff(None, create_patch=True)
+    def grep_pathspec(self) -> List[str]:
+        """Return pathspecs for the files of laws whose name has grep."""
+        if not self.grep:
+            return []
+        grep = re.sub(r'([*?\[\\])', r'\\\1', self.grep)
+        return [f':(glob)*/*{grep}*', f':(glob)*/*{grep}*/**']
+
+    def get_untracked_files(self) -> List[str]:
+        output = self.repo.git.ls_files('--others', '--exclude-standard',
+                                        '-z', '--', *self.grep_pathspec())
+        return [path for path in output.split('\0') if path]
+
+    def iter_changed_files(self):
+        """Yield path and pathspec of each file changed in the working tree.
+
+        Only lists the files, git diff --numstat doesn't create patches. The
+        path is None where HEAD.diff(None) would have no b_blob: for deleted
+        files and for files without content changes. Renamed files come
+        with both paths, so that a patch limited to them is still a rename.
+        With grep, git only compares the files of matching laws.
+        """
+        fields = iter(self.repo.git.diff(
+            self.repo.head.commit, '-M', '--numstat', '-z', '--',
+            *self.grep_pathspec()).split('\0'))
+        for field in fields:
+            if not field:
+                continue
+            added, deleted, path = field.split('\t', 2)
+            if path:
+                pathspec = [path]
+            else:
+                pathspec = [next(fields), next(fields)]
+                path = pathspec[1]
+            if (added, deleted) == ('0', '0') or \
+                    not os.path.lexists(self.path / path):
+                path = None
+            yield path, pathspec
+
+    def iter_changes(self, paths: List[str]):
+        """Yield path and patch of the given files as in HEAD.diff(None).
+
+        Reads the output of git diff file by file instead of loading the
+        whole patch at once.
+        """
+        pathspec = [f':(literal){path}' for path in paths]
+        proc = self.repo.git.diff(self.repo.head.commit, '--abbrev=40',
+                                  '--full-index', '-M', '--no-ext-diff',
+                                  '--no-color', '--', *pathspec,
+                                  as_process=True)
+        chunk: List[bytes] = []
+        for line in proc.stdout:
+            if line.startswith(b'diff --git ') and chunk:
+                yield parse_patch(b''.join(chunk))
+                chunk = []
+            chunk.append(line)
+        if chunk:
+            yield parse_patch(b''.join(chunk))
+        proc.wait()
 
-        for diff in wdiff:
-            diff: Diff
-            if diff.b_blob:
-                law_name = diff.b_blob.path.split('/')[1]
+    def collect_laws(self):
+        # Only the patch of the last changed file of a law is looked at
+        changed: Dict[str, Tuple[str, List[str], Path]] = {}
+        for path, pathspec in self.iter_changed_files():
+            if path:
+                law_name = path.split('/')[1]
                 if self.grep and self.grep not in law_name:
                     continue
-                filename = '/'.join(diff.b_blob.path.split('/')
-                                    [:2] + ['index.md'])
+                filename = '/'.join(path.split('/')[:2] + ['index.md'])
                 filename = self.path / filename
                 if filename.exists():
-                    self.laws[law_name].append(diff.b_blob.path)
-                    self.law_changes[law_name] = (
-                        False, diff.diff.decode(), filename)
+                    self.laws.setdefault(law_name, []).append(path)
+                    self.existing_files.add(path)
+                    changed[law_name] = (path, pathspec, filename)
             else:
                 log("Found deleted law?")
 
-        for filename in self.repo.untracked_files:
+        changed_laws = list(changed.items())
+        # Keep the command line short
+        for start in range(0, len(changed_laws), PATCH_BATCH_SIZE):
+            batch = changed_laws[start:start + PATCH_BATCH_SIZE]
+            patches = dict(self.iter_changes(
+                [p for _, (_, pathspec, _) in batch for p in pathspec]))
+            for law_name, (path, _, filename) in batch:
+                self.law_changes[law_name] = (
+                    False, patches.get(path, b'').decode(), filename)
+
+        for filename in self.get_untracked_files():
             law_name = filename.split('/')[1]
             if self.grep and self.grep not in law_name:
                 continue
-            self.laws[law_name].append(filename)
+            self.laws.setdefault(law_name, []).append(filename)
+            self.existing_files.add(filename)
             filename = '/'.join(filename.split('/')[:2] + ['index.md'])
             filename = self.path / filename
-            with open(filename) as f:
-                self.law_changes[law_name] = (True, f.read(), filename)
+            self.law_changes[law_name] = (
+                True, filename.read_text(encoding='utf-8'), filename)
 
-    def determine_source(self, law_name):
-        new_file, text, filename = self.law_changes[law_name]
-        lines: List[str] = [line for line in text.splitlines()]
-        candidates = self.find_in_sources(lines)
-        if not candidates:
-            with open(filename) as f:
-                lines = [line for line in f.read().splitlines()]
-            candidates.extend(self.find_in_sources(lines))
-        if not candidates:
+    def load_results(self):
+        try:
+            cache = load_json(RESULT_CACHE)
+        except (OSError, ValueError):
+            return {}
+        if cache.get('version') != self.results_version:
+            return {}
+        return cache['results']
+
+    def save_results(self):
+        cache = {'version': self.results_version, 'results': self.results}
+        try:
+            with open(f'{RESULT_CACHE}.tmp', 'w') as f:
+                json.dump(cache, f)
+            os.replace(f'{RESULT_CACHE}.tmp', RESULT_CACHE)
+        except OSError:
+            pass
+
+    def get_cached_result(self, digest: str):
+        index, key = self.results.get(digest, (None, None))
+        if isinstance(key, list):
+            key = tuple(key)
+        if index is None or key not in self.sources[index].data:
             return None
-        return sorted(candidates, key=lambda x: x[0].get_order_key(x[1]))[-1]
+        return index, key
 
-    def find_in_sources(self, lines: List[str]):
-        candidates = []
-        for source in self.sources:
-            try:
-                candidates.extend([(source, c)
-                                   for c in source.find_candidates(lines)])
-            except TransientState:
-                return []
-        return candidates
+    def determine_source(self, law_name):
+        return self.determine_sources([law_name])[0]
+
+    def determine_sources(self, law_names: List[str]):
+        """Return source and key for each law, see find_latest_source().
+
+        Changes seen by an earlier run are looked up in the result cache,
+        many laws are searched in worker processes.
+        """
+        digests = [text_digest(self.law_changes[law][1]) for law in law_names]
+        results = [self.get_cached_result(digest) for digest in digests]
+        missing = [i for i, result in enumerate(results) if result is None]
+        changes = []
+        for i in missing:
+            new_file, text, filename = self.law_changes[law_names[i]]
+            # The text of a new file is the whole law already
+            changes.append((text, None if new_file else filename))
+        if len(changes) < PARALLEL_MIN_LAWS or (os.cpu_count() or 1) < 2:
+            found = [find_latest_source(self.sources, *change)
+                     for change in changes]
+        else:
+            with ProcessPoolExecutor(initializer=init_worker,
+                                     initargs=(self.sources,)) as executor:
+                found = list(executor.map(find_latest_source_in_worker,
+                                          changes, chunksize=16))
+        for i, result in zip(missing, found):
+            if result is None:
+                continue
+            index, key, in_text = result
+            results[i] = index, key
+            # The fallback depends on more than the text of the change
+            if in_text:
+                self.results[digests[i]] = [index, key]
+        return [self.get_source_result(result) for result in results]
+
+    def get_source_result(self, result):
+        if result is None:
+            return None
+        index, key = result
+        return self.sources[index], key
 
     def autocommit(self):
         branches = self.prepare_commits()
+        self.save_results()
         for branch in sorted(branches.keys()):
             self.commit_branch(branch, branches[branch])
 
@@ -360,7 +747,7 @@ class LawGit:
         for ident in commits:
             for law_name, source, key in commits[ident]:
                 for filename in self.laws[law_name]:
-                    if (self.path / filename).exists():
+                    if filename in self.existing_files:
                         log(f"git add {filename}")
                         if not self.dry_run:
                             self.repo.index.add([str(filename)])
@@ -21,30 +21,56 @@ from pathlib import Path
 import json
 import time
 import datetime
+from collections import deque
+from contextlib import closing
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import requests
 
 import lxml.html
+from lxml import etree
+from lxml.cssselect import CSSSelector
 
+# Characters of a page fed to the parser at once
+FEED_SIZE = 2 ** 16
 
-def get_url(url):
-    response = requests.get(url)
+# Pages of years that are downloaded at the same time
+FETCH_WORKERS = 4
+
+
+def get_url(url, session=requests):
+    response = session.get(url)
     response.encoding = 'latin1'
     return response.text
 
 
 def ctext(el):
-    result = []
-    if el.text:
-        result.append(el.text)
-    for sel in el:
-        if sel.tag in ["br"]:
-            result.append(ctext(sel))
-            result.append('\n')
-        else:
-            result.append(ctext(sel))
-        if sel.tail:
-            result.append(sel.tail)
-    return "".join(result)
+    """Return the text of el with a line break for each <br>."""
+    for br in el.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+    return ''.join(el.itertext())
+
+
+def read_tables(parser):
+    for _, table in parser.read_events():
+        if 'tabelle2' not in (table.get('class') or '').split():
+            continue
+        yield table
+        # Drop what has been handled, the rest of the page is still parsed
+        table.clear(keep_tail=True)
+        while table.getprevious() is not None:
+            del table.getparent()[0]
+
+
+def iter_tables(html):
+    """Yield the .tabelle2 tables of html while it is parsed."""
+    parser = etree.HTMLPullParser(events=('end',), tag='table')
+    parser.set_element_class_lookup(lxml.html.HtmlElementClassLookup())
+    for start in range(0, len(html), FEED_SIZE):
+        parser.feed(html[start:start + FEED_SIZE])
+        yield from read_tables(parser)
+    parser.close()
+    yield from read_tables(parser)
 
 
 slugify_re = re.compile('[^a-z]')
@@ -59,70 +85,106 @@ class VkblScraper:
         '&anzahl=10000&start=0&Titel=&Datum=&Muster=&Muster2=&Jahrgang=%d' \
         '&VerordnungsNr=&Seite=&Bereichsname=&DB=&Aktenzeichen='
     PRICE_RE = re.compile(r'Preis: (\d+,\d+) \((\d+) Seite')
+    TR_SEL = CSSSelector('tr', translator='html')
+    TD_SEL = CSSSelector('td', translator='html')
+    ORDER_SEL = CSSSelector('img[src="../images/orange.gif"]',
+                            translator='html')
+    A_SEL = CSSSelector('a', translator='html')
+
+    def __init__(self):
+        self.session = requests.session()
+
+    def fetch_year(self, year):
+        tries = 0
+        while True:
+            try:
+                return get_url(self.URL % year, self.session)
+            except Exception:
+                tries += 1
+                if tries > 10:
+                    raise
+                time.sleep(2 * tries)
+
+    def iter_pages(self, years):
+        """Yield each year with its page, downloading a few years ahead.
+
+        At most FETCH_WORKERS pages are downloaded or kept ahead of the one
+        being parsed.
+        """
+        years = iter(years)
+        with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+            pending = deque((year, executor.submit(self.fetch_year, year))
+                            for year in islice(years, FETCH_WORKERS))
+            try:
+                while pending:
+                    year, future = pending.popleft()
+                    for next_year in islice(years, 1):
+                        pending.append((next_year, executor.submit(
+                            self.fetch_year, next_year)))
+                    yield year, future.result()
+            finally:
+                # Python 3.8 has no shutdown(cancel_futures=True)
+                for _, future in pending:
+                    future.cancel()
+
+    def parse_page(self, items, response):
+        """Add the entries of a page to items and return their number."""
+        tables = 0
+        for i, table in enumerate(iter_tables(response)):
+            tables += 1
+            trs = self.TR_SEL(table)
+            header = self.TD_SEL(trs[0])[0].text_content().strip()
+            print(i, header)
+            try:
+                genre, edition = header.split('\xa0 ')
+                edition = edition.split(' ')[2]
+            except ValueError:
+                genre = header
+                edition = ''
+            title = ctext(self.TD_SEL(trs[1])[0]).replace(
+                'Titel:', '').strip().splitlines()
+            title = [t.strip() for t in title if t.strip()]
+            title, description = title[0], '\n'.join(title[1:])
+            extra = {}
+            for tr in trs[2:]:
+                tds = self.TD_SEL(tr)
+                if len(tds) == 2:
+                    key = tds[0].text_content().replace(':', '').strip()
+                    value = tds[1].text_content().strip()
+                    extra[slugify(key)] = value
+                elif len(tds) == 1:
+                    if self.ORDER_SEL(tds[0]):
+                        link = self.A_SEL(tds[0])[0]
+                        extra['link'] = link.attrib['href']
+                        extra['vid'] = extra['link'].split('=')[-1]
+                        match = self.PRICE_RE.search(tds[0].text_content())
+                        extra['price'] = float(
+                            match.group(1).replace(',', '.'))
+                        extra['pages'] = int(match.group(2))
+            data = dict(extra)
+            data.update({
+                'genre': genre,
+                'edition': edition,
+                'title': title,
+                'description': description
+            })
+
+            jahr = data.get('jahr', '')
+            vonnummer = data.get('vonummer', '')
+            seite = data.get('seite', '')
+            aktenzeichen = data.get('aktenzeichen', '')
+            ident = f"{jahr}.{vonnummer}.{seite}.{aktenzeichen}"
+            items[ident] = data
+        return tables
 
     def scrape(self, low=1947, high=datetime.datetime.now().year):
         items = {}
         total_sum = 0
-        for year in range(low, high + 1):
-            tries = 0
-            while True:
-                try:
-                    response = get_url(self.URL % year)
-                except Exception:
-                    tries += 1
-                    if tries > 10:
-                        raise
-                    time.sleep(2 * tries)
-                    continue
-                else:
-                    break
-            root = lxml.html.fromstring(response)
-            total_sum += len(root.cssselect(".tabelle2"))
-            print(year, len(root.cssselect(".tabelle2")))
-            for i, table in enumerate(root.cssselect(".tabelle2")):
-                trs = table.cssselect('tr')
-                header = trs[0].cssselect('td')[0].text_content().strip()
-                print(i, header)
-                try:
-                    genre, edition = header.split('\xa0 ')
-                    edition = edition.split(' ')[2]
-                except ValueError:
-                    genre = header
-                    edition = ''
-                title = ctext(trs[1].cssselect('td')[0]).replace(
-                    'Titel:', '').strip().splitlines()
-                title = [t.strip() for t in title if t.strip()]
-                title, description = title[0], '\n'.join(title[1:])
-                extra = {}
-                for tr in trs[2:]:
-                    tds = tr.cssselect('td')
-                    if len(tds) == 2:
-                        key = tds[0].text_content().replace(':', '').strip()
-                        value = tds[1].text_content().strip()
-                        extra[slugify(key)] = value
-                    elif len(tds) == 1:
-                        if tds[0].cssselect('img[src="../images/orange.gif"]'):
-                            extra['link'] = tds[0].cssselect(
-                                'a')[0].attrib['href']
-                            extra['vid'] = extra['link'].split('=')[-1]
-                            match = self.PRICE_RE.search(tds[0].text_content())
-                            extra['price'] = float(
-                                match.group(1).replace(',', '.'))
-                            extra['pages'] = int(match.group(2))
-                data = dict(extra)
-                data.update({
-                    'genre': genre,
-                    'edition': edition,
-                    'title': title,
-                    'description': description
-                })
-
-                year = data.get('jahr', '')
-                vonnummer = data.get('vonummer', '')
-                seite = data.get('seite', '')
-                aktenzeichen = data.get('aktenzeichen', '')
-                ident = f"{year}.{vonnummer}.{seite}.{aktenzeichen}"
-                items[ident] = data
+        with closing(self.iter_pages(range(low, high + 1))) as pages:
+            for year, response in pages:
+                tables = self.parse_page(items, response)
+                total_sum += tables
+                print(year, tables)
         print(total_sum, len(items))
         return items
 